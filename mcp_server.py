@@ -1,8 +1,12 @@
 from mcp.server.fastmcp import FastMCP
 import sqlite3
 import random
+import re
 from datetime import datetime, timedelta
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,35 +14,225 @@ load_dotenv()
 mcp = FastMCP("Finance Management Data")
 DB_NAME = os.environ["DB_URL"]
 
+def _connect():
+    """Opens a connection to the database with WAL and tuned PRAGMAs applied."""
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536") # 64 MiB page cache
+    conn.execute("PRAGMA mmap_size=268435456") # 256 MiB memory-mapped I/O
+    # No row_factory: rows stay plain tuples and _fetch_dicts() names the columns
+    return conn
+
+POOL_SIZE = 8 # Sized to the MCP server's worker threads
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Returns the connection pool, opening its connections on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = queue.Queue(maxsize=POOL_SIZE)
+            for _ in range(POOL_SIZE):
+                pool.put(_connect())
+            _pool = pool
+    return _pool
+
+@contextmanager
+def get_conn():
+    """Borrows a connection from the pool and returns it when the block exits."""
+    pool = _get_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        # Never hand an open transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        pool.put(conn)
+
+def _fetch_dicts(cursor):
+    """Fetches the cursor's remaining rows as dictionaries keyed by column name."""
+    cols = [c[0] for c in cursor.description]
+    # Step the cursor directly instead of calling fetchall(), so the rows are
+    # never held twice (once as tuples, once as dicts)
+    return [dict(zip(cols, row)) for row in cursor]
+
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})') # YYYY-MM-DD, used with fullmatch()
+
+def _month_range(month, year=None):
+    """
+    Returns the [start, end) unix-timestamp bounds of a month (in the current
+    year by default), or None (after printing an error) if month or year is invalid.
+    """
+    if year is None:
+        year = datetime.now().year
+    if month not in range(1, 13):
+        print("Error: Invalid month. Please use a month number (1-12).")
+        return None
+    try:
+        start = datetime(year, month, 1)
+        end = datetime(year + (month == 12), (month % 12) + 1, 1)
+        return int(start.timestamp()), int(end.timestamp())
+    except (TypeError, ValueError, OverflowError, OSError):
+        # e.g. a year outside 1-9999, or one the platform can't convert to a
+        # timestamp (year 1, or before 1970 on Windows)
+        print("Error: Invalid year. Please use a year within the supported date range.")
+        return None
+
+def _day_range(date_str):
+    """
+    Returns the [start, end) unix-timestamp bounds of a 'YYYY-MM-DD' day,
+    or None (after printing an error) if date_str is not a valid date.
+    """
+    match = _DATE_RE.fullmatch(date_str)
+    if not match:
+        print("Error: Invalid date format. Please use YYYY-MM-DD.")
+        return None
+    try:
+        start = datetime(int(match[1]), int(match[2]), int(match[3]))
+    except ValueError:
+        # Well-formed but not a real date, e.g. 2024-02-30
+        print("Error: Invalid date. Please use a valid YYYY-MM-DD date.")
+        return None
+    try:
+        end = start + timedelta(days=1)
+        return int(start.timestamp()), int(end.timestamp())
+    except (ValueError, OverflowError, OSError):
+        # A real date with no representable timestamp bounds, e.g. 9999-12-31,
+        # 0001-01-01, or before 1970 on Windows
+        print("Error: Date is out of the supported range.")
+        return None
+
+# Query SQL is kept in module constants so every call passes the identical
+# string and hits the connection's prepared-statement cache.
+# transaction_date is stored as unix seconds and formatted back to local
+# 'YYYY-MM-DD HH:MM:SS' text only in the result columns.
+# Name lookups resolve the person_id(s) first through idx_people_name, which
+# covers person_id (the rowid), then read only those people's transactions.
+_SQL_TX_BY_MONTH = '''
+    SELECT td.transaction_id, strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date, td.amount, td.location, td.description
+    FROM TransactionData td
+    WHERE td.person_id IN (SELECT person_id FROM PeopleInformation WHERE first_name = ? AND last_name = ?)
+      AND td.transaction_date >= ? AND td.transaction_date < ?
+    ORDER BY td.transaction_date
+'''
+
+_SQL_TX_BY_DAY = _SQL_TX_BY_MONTH # Same [start, end) range, just one day wide
+
+_SQL_TX_BY_MONTH_ID = '''
+    SELECT td.transaction_id, strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date, td.amount, td.location, td.description
+    FROM TransactionData td
+    WHERE td.person_id = ?
+      AND td.transaction_date >= ? AND td.transaction_date < ?
+    ORDER BY td.transaction_date
+'''
+
+_SQL_TX_BY_DAY_ID = _SQL_TX_BY_MONTH_ID
+
+# Totals are read from the PersonTotals aggregate instead of summing TransactionData
+_SQL_TOTAL_BY_NAME = '''
+    SELECT SUM(pt.total)
+    FROM PersonTotals pt
+    WHERE pt.person_id IN (SELECT person_id FROM PeopleInformation WHERE first_name = ? AND last_name = ?)
+'''
+
+_SQL_TOTAL_BY_ID = '''
+    SELECT pt.total
+    FROM PersonTotals pt
+    WHERE pt.person_id = ?
+'''
+
+_SQL_LIST_PEOPLE = """
+    SELECT
+        pi.person_id,
+        pi.first_name,
+        pi.last_name,
+        pi.email,
+        pi.phone_number,
+        (
+            -- Top location for this person only, read from idx_tx_person_location
+            SELECT td.location
+            FROM TransactionData td
+            WHERE td.person_id = pi.person_id
+              AND td.location IS NOT NULL AND td.location != '' -- Ignore potentially empty/null locations
+            GROUP BY td.location
+            ORDER BY COUNT(*) DESC, MAX(td.transaction_date) DESC
+            LIMIT 1
+        ) AS most_frequent_location
+    FROM PeopleInformation pi
+    ORDER BY pi.last_name, pi.first_name
+    LIMIT ? OFFSET ?
+"""
+
+_SQL_TX_BY_LOCATION = '''
+    SELECT
+        td.transaction_id,
+        pi.first_name,
+        pi.last_name,
+        strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date,
+        td.amount,
+        td.location,
+        td.description
+    FROM TransactionData td
+    JOIN PeopleInformation pi ON td.person_id = pi.person_id
+    WHERE td.location = ?
+    ORDER BY td.transaction_date DESC -- Served in order by idx_tx_location_date, no sort
+    LIMIT ? OFFSET ?
+'''
+
 @mcp.tool()
-def get_transactions_by_month_and_name(first_name, last_name, month):
+def get_transactions_by_month_and_name(first_name, last_name, month, year=None):
     """
     Fetches all transactions for a given person in a specific month.
     Args:
         first_name (str): First name of the person.
         last_name (str): Last name of the person.
         month (int): The month number (1-12).
+        year (int, optional): The year of the month. Defaults to the current year.
     Returns:
         list: A list of tuples representing the transactions, or empty list if none found.
               Each tuple contains (transaction_id, transaction_date, amount, location, description).
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    month_str = f"{month:02d}"
+    bounds = _month_range(month, year)
+    if bounds is None:
+        return []
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_MONTH, (first_name, last_name, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
+
+@mcp.tool()
+def get_transactions_by_month_and_id(person_id, month, year=None):
+    """
+    Fetches all transactions for the person with the given ID in a specific month.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+        month (int): The month number (1-12).
+        year (int, optional): The year of the month. Defaults to the current year.
+    Returns:
+        list: A list of dictionaries representing the transactions, or empty list if none found.
+              Keys: 'transaction_id', 'transaction_date', 'amount', 'location', 'description'
+    """
+    bounds = _month_range(month, year)
+    if bounds is None:
+        return []
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT td.transaction_id, td.transaction_date, td.amount, td.location, td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-          AND strftime('%m', td.transaction_date) = ?
-        ORDER BY td.transaction_date
-    ''', (first_name, last_name, month_str))
+        cursor.execute(_SQL_TX_BY_MONTH_ID, (person_id, *bounds))
 
-    transactions = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in transactions]
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 @mcp.tool()
 def get_transactions_by_day_and_name(first_name, last_name, date_str):
@@ -52,29 +246,42 @@ def get_transactions_by_day_and_name(first_name, last_name, date_str):
         list: A list of tuples representing the transactions, or empty list if none found.
               Each tuple contains (transaction_id, transaction_date, amount, location, description).
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    bounds = _day_range(date_str)
+    if bounds is None:
+        return []
 
-    try:
-        datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError:
-        print("Error: Invalid date format. Please use YYYY-MM-DD.")
-        conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_DAY, (first_name, last_name, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
+
+@mcp.tool()
+def get_transactions_by_day_and_id(person_id, date_str):
+    """
+    Fetches all transactions for the person with the given ID on a specific day.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+        date_str (str): The date string in 'YYYY-MM-DD' format.
+    Returns:
+        list: A list of dictionaries representing the transactions, or empty list if none found.
+              Keys: 'transaction_id', 'transaction_date', 'amount', 'location', 'description'
+    """
+    bounds = _day_range(date_str)
+    if bounds is None:
         return []
 
-    cursor.execute('''
-        SELECT td.transaction_id, td.transaction_date, td.amount, td.location, td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-          AND date(td.transaction_date) = ?
-        ORDER BY td.transaction_date
-    ''', (first_name, last_name, date_str))
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    transactions = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in transactions]
+        cursor.execute(_SQL_TX_BY_DAY_ID, (person_id, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 @mcp.tool()
 def get_total_transaction_amount_by_name(first_name, last_name):
@@ -86,18 +293,12 @@ def get_total_transaction_amount_by_name(first_name, last_name):
     Returns:
         float: The total amount spent, or 0.0 if the person or transactions are not found.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT SUM(td.amount)
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-    ''', (first_name, last_name))
+        cursor.execute(_SQL_TOTAL_BY_NAME, (first_name, last_name))
 
-    result = cursor.fetchone()
-    conn.close()
+        result = cursor.fetchone()
 
     if result and result[0] is not None:
         return round(result[0], 2)
@@ -105,80 +306,68 @@ def get_total_transaction_amount_by_name(first_name, last_name):
         return 0.0
 
 @mcp.tool()
-def list_all_people():
+def get_total_transaction_amount_by_id(person_id):
+    """
+    Calculates the total amount spent in transactions by the person with the given ID.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+    Returns:
+        float: The total amount spent, or 0.0 if the person or transactions are not found.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TOTAL_BY_ID, (person_id,))
+
+        result = cursor.fetchone()
+
+    if result and result[0] is not None:
+        return round(result[0], 2)
+    else:
+        return 0.0
+
+@mcp.tool()
+def list_all_people(limit=1000, offset=0):
     """
     Fetches a list of all people in the system, including their
     most frequent transaction location.
+    Args:
+        limit (int, optional): Maximum number of rows to return. Defaults to 1000.
+        offset (int, optional): Number of rows to skip, for paging. Defaults to 0.
     Returns:
         list: A list of dictionaries, each representing a person.
               Keys: 'person_id', 'first_name', 'last_name', 'email',
                     'phone_number', 'most_frequent_location' (can be None).
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    sql_query = """
-    WITH RankedLocations AS (
-        SELECT
-            person_id,
-            location,
-            ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY COUNT(*) DESC, MAX(transaction_date) DESC) as rn
-        FROM TransactionData
-        WHERE location IS NOT NULL AND location != '' -- Ignore potentially empty/null locations
-        GROUP BY person_id, location
-    )
-    SELECT
-        pi.person_id,
-        pi.first_name,
-        pi.last_name,
-        pi.email,
-        pi.phone_number,
-        rl.location AS most_frequent_location
-    FROM PeopleInformation pi
-    LEFT JOIN RankedLocations rl ON pi.person_id = rl.person_id AND rl.rn = 1 -- Get only the top ranked location (rn=1)
-    ORDER BY pi.last_name, pi.first_name;
-    """
-
-    cursor.execute(sql_query)
-    people = cursor.fetchall()
-    conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_SQL_LIST_PEOPLE, (limit, offset))
+        people = _fetch_dicts(cursor)
 
-    return [dict(row) for row in people]
+    return people
 
 
 @mcp.tool()
-def get_transactions_by_location(location):
+def get_transactions_by_location(location, limit=1000, offset=0):
     """
     Fetches all transactions that occurred at a specific location.
     Args:
         location (str): The location name to filter by.
+        limit (int, optional): Maximum number of rows to return. Defaults to 1000.
+        offset (int, optional): Number of rows to skip, for paging. Defaults to 0.
     Returns:
         list: A list of dictionaries representing the transactions including person's name.
               Keys: 'transaction_id', 'first_name', 'last_name', 'transaction_date',
                     'amount', 'location', 'description'
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            td.transaction_id,
-            pi.first_name,
-            pi.last_name,
-            td.transaction_date,
-            td.amount,
-            td.location,
-            td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE td.location = ?
-        ORDER BY td.transaction_date DESC
-    ''', (location,))
-
-    transactions = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in transactions]
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_LOCATION, (location, limit, offset))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 if __name__ == "__main__":
     
@@ -1,8 +1,13 @@
 import sqlite3
 import random
+import re
 from faker import Faker
 from datetime import datetime, timedelta
 import os 
+import queue
+import threading
+from contextlib import contextmanager
+from uuid import uuid4
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,140 +17,453 @@ NUM_PEOPLE = 12
 MIN_TRANSACTIONS_PER_PERSON = 5
 MAX_TRANSACTIONS_PER_PERSON = 25
 POSSIBLE_LOCATIONS = ["New York", "London", "Tokyo", "Paris", "Berlin", "Sydney", "Mumbai", "Online", "Arcot", "Chennai"]
-
-fake = Faker()
+TRANSACTION_CATEGORIES = ["Groceries", "Dining", "Travel", "Shopping", "Utilities", "Entertainment", "Healthcare", "Transport"]
+SQLITE_MAX_VARIABLES = 999 # Default bound-parameter limit of older SQLite builds
+PRODUCER_BATCH_SIZE = 32 # People per batch; each batch queues a people chunk and a ~480-transaction chunk
+PRODUCER_QUEUE_SIZE = 40 # Max chunks waiting for the writer (20 batches, ~10,000 rows)
+PRODUCER_PUT_TIMEOUT = 0.1 # Seconds between checks of the stop flag while the queue is full
+PEOPLE_COLUMNS = ("person_id", "first_name", "last_name", "email", "phone_number")
+TRANSACTION_COLUMNS = ("person_id", "transaction_date", "amount", "location", "description")
+
+def _connect():
+    """Opens a connection to the database with WAL and tuned PRAGMAs applied."""
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536") # 64 MiB page cache
+    conn.execute("PRAGMA mmap_size=268435456") # 256 MiB memory-mapped I/O
+    # No row_factory: rows stay plain tuples and _fetch_dicts() names the columns
+    return conn
+
+POOL_SIZE = 8 # Sized to the MCP server's worker threads
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Returns the connection pool, opening its connections on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = queue.Queue(maxsize=POOL_SIZE)
+            for _ in range(POOL_SIZE):
+                pool.put(_connect())
+            _pool = pool
+    return _pool
+
+@contextmanager
+def get_conn():
+    """Borrows a connection from the pool and returns it when the block exits."""
+    pool = _get_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        # Never hand an open transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        pool.put(conn)
+
+def _fetch_dicts(cursor):
+    """Fetches the cursor's remaining rows as dictionaries keyed by column name."""
+    cols = [c[0] for c in cursor.description]
+    # Step the cursor directly instead of calling fetchall(), so the rows are
+    # never held twice (once as tuples, once as dicts)
+    return [dict(zip(cols, row)) for row in cursor]
 
 def setup_database():
     """Creates the database and tables if they don't exist."""
     db_exists = os.path.exists(DB_NAME)
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Create PeopleInformation table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS PeopleInformation (
-            person_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT UNIQUE,
-            phone_number TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # Create TransactionData table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS TransactionData (
-            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            person_id INTEGER NOT NULL,
-            transaction_date TIMESTAMP NOT NULL,
-            amount REAL NOT NULL,
-            location TEXT,
-            description TEXT,
-            FOREIGN KEY (person_id) REFERENCES PeopleInformation(person_id)
-        )
-    ''')
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        # Databases created before transaction_date became a unix timestamp store
+        # it as TEXT, which every date query would silently fail to match
+        cursor.execute("PRAGMA table_info(TransactionData)")
+        date_type = next((row[2] for row in cursor if row[1] == "transaction_date"), "INTEGER")
+        if date_type.upper() != "INTEGER":
+            raise RuntimeError(
+                f"Database '{DB_NAME}' stores transaction_date as {date_type}, not INTEGER. "
+                "It was created by an older version of this script; delete it and re-run populate.py."
+            )
+
+        # Create PeopleInformation table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS PeopleInformation (
+                person_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                email TEXT UNIQUE,
+                phone_number TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Create TransactionData table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS TransactionData (
+                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                person_id INTEGER NOT NULL,
+                transaction_date INTEGER NOT NULL, -- Unix timestamp (seconds)
+                amount REAL NOT NULL,
+                location TEXT,
+                description TEXT,
+                FOREIGN KEY (person_id) REFERENCES PeopleInformation(person_id)
+            )
+        ''')
+
+        # Create PersonTotals table (running SUM(amount) per person, see create_person_totals())
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS PersonTotals (
+                person_id INTEGER PRIMARY KEY,
+                total REAL NOT NULL DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
 
-    conn.commit()
-    conn.close()
     if not db_exists:
         print(f"Database '{DB_NAME}' and tables created successfully.")
     else:
         print(f"Database '{DB_NAME}' already exists. Tables checked/created.")
 
+def _insert_rows(cursor, table, columns, rows):
+    """
+    Inserts rows with multi-row 'VALUES (...), (...), ...' statements, packing
+    as many rows into each statement as SQLite's bound-parameter limit allows.
+    """
+    placeholder = "(" + ", ".join("?" * len(columns)) + ")"
+    chunk_size = SQLITE_MAX_VARIABLES // len(columns)
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([placeholder] * len(chunk)),
+            [value for row in chunk for value in row],
+        )
+
+def _put_chunk(chunks, stop, item):
+    """
+    Puts item on the chunks queue, waiting for space only until stop is set.
+    Returns False if it gave up because the writer has stopped.
+    """
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=PRODUCER_PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _generate_rows(person_ids, chunks, stop):
+    """
+    Producer thread for populate_dummy_data(): generates the people with the
+    given IDs plus their transactions, and puts them on the chunks queue as
+    (table, columns, rows) items. Always ends with None; an exception raised
+    while generating is put on the queue first so the writer can re-raise it.
+    Returns early once stop is set, so a failed load never leaves it blocked.
+    """
+    try:
+        fake = Faker() # One per thread, Faker instances aren't shared
+        # Realistic dates within the last 2 years, as unix timestamps
+        now = int(datetime.now().timestamp())
+        window_seconds = 2 * 365 * 24 * 60 * 60
+
+        for i in range(0, len(person_ids), PRODUCER_BATCH_SIZE):
+            if stop.is_set():
+                return
+            ids = person_ids[i:i + PRODUCER_BATCH_SIZE]
+
+            # Generate Person Data in bulk
+            first_names = [fake.first_name() for _ in ids]
+            last_names = [fake.last_name() for _ in ids]
+            # Unique by construction, so the load never hits the UNIQUE constraint on email
+            emails = [f"user{person_id}_{uuid4().hex[:8]}@example.com" for person_id in ids]
+            phones = [fake.phone_number() for _ in ids]
+            if not _put_chunk(chunks, stop, ("PeopleInformation", PEOPLE_COLUMNS, list(zip(ids, first_names, last_names, emails, phones)))):
+                return
+
+            # Generate Transaction Data in bulk, sampling every column once for the batch
+            tx_counts = [random.randint(MIN_TRANSACTIONS_PER_PERSON, MAX_TRANSACTIONS_PER_PERSON) for _ in ids]
+            total_tx = sum(tx_counts)
+            tx_person_ids = [person_id for person_id, count in zip(ids, tx_counts) for _ in range(count)]
+            dates = [now - random.randrange(window_seconds) for _ in range(total_tx)]
+            amounts = [round(random.uniform(5.0, 1000.0), 2) for _ in range(total_tx)] # Transaction amount between 5 and 1000
+            locations = random.choices(POSSIBLE_LOCATIONS, k=total_tx)
+            descriptions = [f"{category} purchase" for category in random.choices(TRANSACTION_CATEGORIES, k=total_tx)]
+            if not _put_chunk(chunks, stop, ("TransactionData", TRANSACTION_COLUMNS, list(zip(tx_person_ids, dates, amounts, locations, descriptions)))):
+                return
+    except Exception as e:
+        _put_chunk(chunks, stop, e)
+    finally:
+        _put_chunk(chunks, stop, None)
+
 def populate_dummy_data(num_people=NUM_PEOPLE):
-    """Populates the database with dummy data."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT COUNT(*) FROM PeopleInformation")
-    if cursor.fetchone()[0] > 0:
-        print("Database already contains data. Skipping population.")
-        conn.close()
-        return
-
-    print(f"Populating database with {num_people} people and their transactions...")
-    people_added = 0
-    while people_added < num_people:
+    """
+    Populates the database with dummy data, then makes sure PersonTotals is
+    filled and kept up to date (see create_person_totals()), which the total
+    queries rely on.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COUNT(*) FROM PeopleInformation")
+        if cursor.fetchone()[0] > 0:
+            print("Database already contains data. Skipping population.")
+            # Still backfill PersonTotals for data loaded before it existed
+            create_person_totals()
+            return
+
+        print(f"Populating database with {num_people} people and their transactions...")
+
+        # The table is empty, so the new people can be given IDs 1..num_people up
+        # front and each producer can key its transactions without a read-back
+        person_ids = list(range(1, num_people + 1))
+        # Under the GIL the producers mainly overlap Python-side generation with
+        # SQLite's inserts (which release the GIL); they don't run Faker in parallel
+        workers = max(1, min(os.cpu_count() or 1, num_people))
+        chunks = queue.Queue(maxsize=PRODUCER_QUEUE_SIZE)
+        stop = threading.Event()
+        producers = [
+            threading.Thread(target=_generate_rows, args=(person_ids[w::workers], chunks, stop), daemon=True)
+            for w in range(workers)
+        ]
+        for producer in producers:
+            producer.start()
+
+        # This thread is the single writer: it drains the queue into one
+        # transaction (committed on exit, rolled back on error) while the
+        # producers keep generating
         try:
-            # Generate Person Data
-            first_name = fake.first_name()
-            last_name = fake.last_name()
-            email = fake.unique.email() # Ensure email is unique
-            phone = fake.phone_number()
+            with conn:
+                finished = 0
+                while finished < workers:
+                    item = chunks.get()
+                    if item is None:
+                        finished += 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        table, columns, rows = item
+                        _insert_rows(cursor, table, columns, rows)
+        finally:
+            # If the load failed, this releases any producer waiting on the full queue
+            stop.set()
+            for producer in producers:
+                producer.join()
+
+    # Built after the load so the bulk insert doesn't run the trigger once per row
+    create_person_totals()
+    print("Dummy data population complete.")
+
+def create_indexes():
+    """
+    Creates the indexes used by the query functions if they don't exist.
+    Called after populate_dummy_data() so the bulk load doesn't have to
+    maintain every index on each insert.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-            # Insert Person
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_person_date ON TransactionData(person_id, transaction_date)')
+        # Rows come back already in get_transactions_by_location()'s ORDER BY, so it
+        # needs no sort step and can stop after LIMIT rows
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_location_date ON TransactionData(location, transaction_date DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_date ON TransactionData(transaction_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_person_location ON TransactionData(person_id, location, transaction_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_people_name ON PeopleInformation(last_name, first_name)')
+
+        conn.commit()
+
+def create_person_totals():
+    """
+    Fills PersonTotals from the existing transactions and installs the trigger
+    that keeps it up to date on every later insert. Does nothing if the trigger
+    already exists. Called by populate_dummy_data() once its bulk load is done,
+    so the load doesn't run the trigger once per row.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_tx_ins'")
+        if cursor.fetchone():
+            return
+
+        # Backfill and create the trigger in one transaction so no insert is missed or counted twice
+        with conn:
+            cursor.execute("DELETE FROM PersonTotals")
             cursor.execute('''
-                INSERT INTO PeopleInformation (first_name, last_name, email, phone_number)
-                VALUES (?, ?, ?, ?)
-            ''', (first_name, last_name, email, phone))
-
-            person_id = cursor.lastrowid # Get the ID of the newly inserted person
-            people_added += 1
-
-            # Generate Transaction Data for this person
-            num_transactions = random.randint(MIN_TRANSACTIONS_PER_PERSON, MAX_TRANSACTIONS_PER_PERSON)
-            for _ in range(num_transactions):
-                # Generate realistic date within the last 2 years
-                transaction_date = fake.date_time_between(start_date="-2y", end_date="now")
-                # Ensure timezone info is removed if present, as SQLite might handle it differently
-                transaction_date = transaction_date.replace(tzinfo=None)
-                amount = round(random.uniform(5.0, 1000.0), 2) # Transaction amount between 5 and 1000
-                location = random.choice(POSSIBLE_LOCATIONS)
-                description = fake.sentence(nb_words=5) # Short description
-
-                cursor.execute('''
-                    INSERT INTO TransactionData (person_id, transaction_date, amount, location, description)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (person_id, transaction_date, amount, location, description))
-
-        except sqlite3.IntegrityError as e:
-             # This might happen if faker generates a duplicate email despite 'unique'
-            print(f"Skipping duplicate entry error: {e}. Trying next person.")
-            conn.rollback() # Rollback the failed person insert
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            conn.rollback() # Rollback any partial inserts for the current person
-
-
-    conn.commit()
-    conn.close()
-    print("Dummy data population complete.")
+                INSERT INTO PersonTotals (person_id, total)
+                SELECT person_id, SUM(amount) FROM TransactionData GROUP BY person_id
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER trg_tx_ins AFTER INSERT ON TransactionData
+                BEGIN
+                    INSERT INTO PersonTotals (person_id, total) VALUES (NEW.person_id, NEW.amount)
+                    ON CONFLICT(person_id) DO UPDATE SET total = total + NEW.amount;
+                END
+            ''')
 
 # --- Query Functions ---
 
-def get_transactions_by_month_and_name(first_name, last_name, month):
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})') # YYYY-MM-DD, used with fullmatch()
+
+def _month_range(month, year=None):
+    """
+    Returns the [start, end) unix-timestamp bounds of a month (in the current
+    year by default), or None (after printing an error) if month or year is invalid.
+    """
+    # Compare against a [start, end) range on the raw column so an index on
+    # transaction_date can be used (strftime() on the column prevents that)
+    if year is None:
+        year = datetime.now().year
+    if month not in range(1, 13):
+        print("Error: Invalid month. Please use a month number (1-12).")
+        return None
+    try:
+        start = datetime(year, month, 1)
+        end = datetime(year + (month == 12), (month % 12) + 1, 1)
+        return int(start.timestamp()), int(end.timestamp())
+    except (TypeError, ValueError, OverflowError, OSError):
+        # e.g. a year outside 1-9999, or one the platform can't convert to a
+        # timestamp (year 1, or before 1970 on Windows)
+        print("Error: Invalid year. Please use a year within the supported date range.")
+        return None
+
+def _day_range(date_str):
+    """
+    Returns the [start, end) unix-timestamp bounds of a 'YYYY-MM-DD' day,
+    or None (after printing an error) if date_str is not a valid date.
+    """
+    # Validate date format with the precompiled regex (basic check)
+    match = _DATE_RE.fullmatch(date_str)
+    if not match:
+        print("Error: Invalid date format. Please use YYYY-MM-DD.")
+        return None
+    try:
+        start = datetime(int(match[1]), int(match[2]), int(match[3]))
+    except ValueError:
+        # Well-formed but not a real date, e.g. 2024-02-30
+        print("Error: Invalid date. Please use a valid YYYY-MM-DD date.")
+        return None
+    try:
+        end = start + timedelta(days=1)
+        return int(start.timestamp()), int(end.timestamp())
+    except (ValueError, OverflowError, OSError):
+        # A real date with no representable timestamp bounds, e.g. 9999-12-31,
+        # 0001-01-01, or before 1970 on Windows
+        print("Error: Date is out of the supported range.")
+        return None
+
+# Query SQL is kept in module constants so every call passes the identical
+# string and hits the connection's prepared-statement cache.
+# transaction_date is stored as unix seconds and formatted back to local
+# 'YYYY-MM-DD HH:MM:SS' text only in the result columns.
+# Name lookups resolve the person_id(s) first through idx_people_name, which
+# covers person_id (the rowid), then read only those people's transactions.
+_SQL_TX_BY_MONTH = '''
+    SELECT td.transaction_id, strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date, td.amount, td.location, td.description
+    FROM TransactionData td
+    WHERE td.person_id IN (SELECT person_id FROM PeopleInformation WHERE first_name = ? AND last_name = ?)
+      AND td.transaction_date >= ? AND td.transaction_date < ?
+    ORDER BY td.transaction_date
+'''
+
+_SQL_TX_BY_DAY = _SQL_TX_BY_MONTH # Same [start, end) range, just one day wide
+
+_SQL_TX_BY_MONTH_ID = '''
+    SELECT td.transaction_id, strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date, td.amount, td.location, td.description
+    FROM TransactionData td
+    WHERE td.person_id = ?
+      AND td.transaction_date >= ? AND td.transaction_date < ?
+    ORDER BY td.transaction_date
+'''
+
+_SQL_TX_BY_DAY_ID = _SQL_TX_BY_MONTH_ID
+
+# Totals are read from the PersonTotals aggregate instead of summing TransactionData
+_SQL_TOTAL_BY_NAME = '''
+    SELECT SUM(pt.total)
+    FROM PersonTotals pt
+    WHERE pt.person_id IN (SELECT person_id FROM PeopleInformation WHERE first_name = ? AND last_name = ?)
+'''
+
+_SQL_TOTAL_BY_ID = '''
+    SELECT pt.total
+    FROM PersonTotals pt
+    WHERE pt.person_id = ?
+'''
+
+_SQL_LIST_PEOPLE = '''
+    SELECT person_id, first_name, last_name, email, phone_number
+    FROM PeopleInformation
+    ORDER BY last_name, first_name
+    LIMIT ? OFFSET ?
+'''
+
+_SQL_TX_BY_LOCATION = '''
+    SELECT
+        td.transaction_id,
+        pi.first_name,
+        pi.last_name,
+        strftime('%Y-%m-%d %H:%M:%S', td.transaction_date, 'unixepoch', 'localtime') AS transaction_date,
+        td.amount,
+        td.location,
+        td.description
+    FROM TransactionData td
+    JOIN PeopleInformation pi ON td.person_id = pi.person_id
+    WHERE td.location = ?
+    ORDER BY td.transaction_date DESC -- Served in order by idx_tx_location_date, no sort
+    LIMIT ? OFFSET ?
+'''
+
+def get_transactions_by_month_and_name(first_name, last_name, month, year=None):
     """
     Fetches all transactions for a given person in a specific month.
     Args:
         first_name (str): First name of the person.
         last_name (str): Last name of the person.
         month (int): The month number (1-12).
+        year (int, optional): The year of the month. Defaults to the current year.
     Returns:
         list: A list of tuples representing the transactions, or empty list if none found.
               Each tuple contains (transaction_id, transaction_date, amount, location, description).
     """
-    conn = sqlite3.connect(DB_NAME)
-    # Return rows as dictionary-like objects
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    bounds = _month_range(month, year)
+    if bounds is None:
+        return []
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    # Format month with leading zero if needed (e.g., 1 -> '01')
-    month_str = f"{month:02d}"
+        cursor.execute(_SQL_TX_BY_MONTH, (first_name, last_name, *bounds))
 
-    cursor.execute('''
-        SELECT td.transaction_id, td.transaction_date, td.amount, td.location, td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-          AND strftime('%m', td.transaction_date) = ?
-        ORDER BY td.transaction_date
-    ''', (first_name, last_name, month_str))
+        transactions = _fetch_dicts(cursor)
 
-    transactions = cursor.fetchall()
-    conn.close()
-    # Convert Row objects to standard dictionaries for easier use
-    return [dict(row) for row in transactions]
+    return transactions
+
+def get_transactions_by_month_and_id(person_id, month, year=None):
+    """
+    Fetches all transactions for the person with the given ID in a specific month.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+        month (int): The month number (1-12).
+        year (int, optional): The year of the month. Defaults to the current year.
+    Returns:
+        list: A list of dictionaries representing the transactions, or empty list if none found.
+              Keys: 'transaction_id', 'transaction_date', 'amount', 'location', 'description'
+    """
+    bounds = _month_range(month, year)
+    if bounds is None:
+        return []
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_MONTH_ID, (person_id, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 def get_transactions_by_day_and_name(first_name, last_name, date_str):
     """
@@ -158,30 +476,41 @@ def get_transactions_by_day_and_name(first_name, last_name, date_str):
         list: A list of tuples representing the transactions, or empty list if none found.
               Each tuple contains (transaction_id, transaction_date, amount, location, description).
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    bounds = _day_range(date_str)
+    if bounds is None:
+        return []
 
-    # Validate date format (basic check)
-    try:
-        datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError:
-        print("Error: Invalid date format. Please use YYYY-MM-DD.")
-        conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_DAY, (first_name, last_name, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
+
+def get_transactions_by_day_and_id(person_id, date_str):
+    """
+    Fetches all transactions for the person with the given ID on a specific day.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+        date_str (str): The date string in 'YYYY-MM-DD' format.
+    Returns:
+        list: A list of dictionaries representing the transactions, or empty list if none found.
+              Keys: 'transaction_id', 'transaction_date', 'amount', 'location', 'description'
+    """
+    bounds = _day_range(date_str)
+    if bounds is None:
         return []
 
-    cursor.execute('''
-        SELECT td.transaction_id, td.transaction_date, td.amount, td.location, td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-          AND date(td.transaction_date) = ?
-        ORDER BY td.transaction_date
-    ''', (first_name, last_name, date_str))
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    transactions = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in transactions]
+        cursor.execute(_SQL_TX_BY_DAY_ID, (person_id, *bounds))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 def get_total_transaction_amount_by_name(first_name, last_name):
     """
@@ -192,96 +521,94 @@ def get_total_transaction_amount_by_name(first_name, last_name):
     Returns:
         float: The total amount spent, or 0.0 if the person or transactions are not found.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT SUM(td.amount)
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE pi.first_name = ? AND pi.last_name = ?
-    ''', (first_name, last_name))
+        cursor.execute(_SQL_TOTAL_BY_NAME, (first_name, last_name))
 
-    result = cursor.fetchone()
-    conn.close()
+        result = cursor.fetchone()
 
     # fetchone() returns a tuple (total,) or (None,) if no matching rows
     if result and result[0] is not None:
         return round(result[0], 2)
     else:
         return 0.0
+
+def get_total_transaction_amount_by_id(person_id):
+    """
+    Calculates the total amount spent in transactions by the person with the given ID.
+    Args:
+        person_id (int): ID of the person, as returned by list_all_people.
+    Returns:
+        float: The total amount spent, or 0.0 if the person or transactions are not found.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TOTAL_BY_ID, (person_id,))
+
+        result = cursor.fetchone()
+
+    if result and result[0] is not None:
+        return round(result[0], 2)
+    else:
+        return 0.0
         
 # --- Alternative: Get total transaction COUNT by name ---
 # def get_total_transaction_count_by_name(first_name, last_name):
 #     """Calculates the total number of transactions made by a given person."""
-#     conn = sqlite3.connect(DB_NAME)
-#     cursor = conn.cursor()
-#     cursor.execute('''
-#         SELECT COUNT(td.transaction_id)
-#         FROM TransactionData td
-#         JOIN PeopleInformation pi ON td.person_id = pi.person_id
-#         WHERE pi.first_name = ? AND pi.last_name = ?
-#     ''', (first_name, last_name))
-#     result = cursor.fetchone()
-#     conn.close()
+#     with get_conn() as conn:
+#         cursor = conn.cursor()
+#         cursor.execute('''
+#             SELECT COUNT(td.transaction_id)
+#             FROM TransactionData td
+#             JOIN PeopleInformation pi ON td.person_id = pi.person_id
+#             WHERE pi.first_name = ? AND pi.last_name = ?
+#         ''', (first_name, last_name))
+#         result = cursor.fetchone()
 #     return result[0] if result else 0
 
 
-def list_all_people():
+def list_all_people(limit=1000, offset=0):
     """
     Fetches a list of all people in the system.
+    Args:
+        limit (int, optional): Maximum number of rows to return. Defaults to 1000.
+        offset (int, optional): Number of rows to skip, for paging. Defaults to 0.
     Returns:
         list: A list of dictionaries, each representing a person.
               Keys: 'person_id', 'first_name', 'last_name', 'email', 'phone_number'
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row # Return rows as dictionary-like objects
-    cursor = conn.cursor()
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT person_id, first_name, last_name, email, phone_number
-        FROM PeopleInformation
-        ORDER BY last_name, first_name
-    ''')
+        cursor.execute(_SQL_LIST_PEOPLE, (limit, offset))
 
-    people = cursor.fetchall()
-    conn.close()
-    # Convert Row objects to standard dictionaries
-    return [dict(row) for row in people]
+        people = _fetch_dicts(cursor)
 
+    return people
 
-def get_transactions_by_location(location):
+
+def get_transactions_by_location(location, limit=1000, offset=0):
     """
     Fetches all transactions that occurred at a specific location.
     Args:
         location (str): The location name to filter by.
+        limit (int, optional): Maximum number of rows to return. Defaults to 1000.
+        offset (int, optional): Number of rows to skip, for paging. Defaults to 0.
     Returns:
         list: A list of dictionaries representing the transactions including person's name.
               Keys: 'transaction_id', 'first_name', 'last_name', 'transaction_date',
                     'amount', 'location', 'description'
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            td.transaction_id,
-            pi.first_name,
-            pi.last_name,
-            td.transaction_date,
-            td.amount,
-            td.location,
-            td.description
-        FROM TransactionData td
-        JOIN PeopleInformation pi ON td.person_id = pi.person_id
-        WHERE td.location = ?
-        ORDER BY td.transaction_date DESC
-    ''', (location,))
-
-    transactions = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in transactions]
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_SQL_TX_BY_LOCATION, (location, limit, offset))
+
+        transactions = _fetch_dicts(cursor)
+
+    return transactions
 
 
 # --- Main Execution ---
@@ -292,6 +619,9 @@ if __name__ == "__main__":
     # 2. Populate with dummy data (only if empty)
     populate_dummy_data()
 
+    # Build indexes once the data is in (no-op if already done)
+    create_indexes()
+
     print("\n--- Database Operations Demo ---")
 
     # 3. List all people